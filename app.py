@@ -1,31 +1,254 @@
 import base64
+import hashlib
 import json
 import os
+import re
+import string
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 
 import requests
 import streamlit as st
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 load_dotenv()
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 DATA_DIR = Path("data")
 VIDEOS_FILE = DATA_DIR / "videos.json"
+VIDEOS_MSGPACK_FILE = DATA_DIR / "videos.msgpack"
+VIDEOS_NORMALIZED_FILE = DATA_DIR / "videos.normalized.json"
 SUBTITLES_DIR = DATA_DIR / "subtitles"
 SYSTEM_PROMPT_FILE = Path("system_prompt.md")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 VIDEO_DATA_API_URL = os.getenv("VIDEO_DATA_API_URL", "")
 
+# Local files / API responses larger than these are stream-parsed with ijson (if installed)
+STREAM_PARSE_THRESHOLD = 50 * 1024 * 1024
+API_STREAM_PARSE_THRESHOLD = 10 * 1024 * 1024
+# Per-video fields read by the app; everything else is dropped when streaming
+VIDEO_FIELDS = (
+    "id", "title", "topics", "keywords", "duration", "duration_formatted",
+    "url", "subtitle_file", "transcript", "transcribed_at",
+)
+
+# Per-video fields sent to the browser up-front (transcripts are loaded lazily)
+CLIENT_FIELDS = (
+    "id", "title", "topics", "keywords", "title_lc", "topics_lc", "keywords_lc",
+    "duration", "duration_seconds", "url",
+)
+
+# Threads used to read and encode subtitle files when building the page
+SUBTITLE_READ_WORKERS = 8
+
+# Query words are at least 2 characters, so the search index uses 2-grams
+SEARCH_GRAM_LEN = 2
+
+# Seconds before cached video data / system prompt are reloaded from source
+DATA_CACHE_TTL = 3600
+
+# Bump whenever normalize_video / _search_fields change the stored shape
+NORMALIZED_FORMAT_VERSION = 1
+
+
+@st.cache_resource
+def _shared() -> dict:
+    """Process-wide resources shared across Streamlit sessions and reruns.
+
+    - session: HTTP session with keep-alive pooling and retry with backoff
+    - api_etags: url -> (etag, parsed body) of the last successful API response
+    - subtitle_cache: subtitle path -> (mtime_ns, data URL)
+    """
+    adapter = HTTPAdapter(
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return {"session": session, "api_etags": {}, "subtitle_cache": {}}
+
+
+def _json_loads(data: bytes):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumpb(value) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_dumps(value) -> str:
+    """Serialize to a compact UTF-8 JSON string, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stream_videos(fp) -> dict:
+    """Stream-parse a videos payload, keeping only the fields in VIDEO_FIELDS."""
+    videos = [
+        {key: v[key] for key in VIDEO_FIELDS if key in v}
+        for v in ijson.items(fp, "videos.item", use_float=True)
+    ]
+    return {"videos": videos, "metadata": {}}
+
+
+def fetch_videos_from_api(url: str) -> dict:
+    """Fetch video data from the API, revalidating with ETag when possible."""
+    shared = _shared()
+    headers = {}
+    cached = shared["api_etags"].get(url)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+
+    with shared["session"].get(url, headers=headers, stream=True, timeout=(3, 30)) as response:
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+
+        content_length = int(response.headers.get("Content-Length") or 0)
+        if ijson is not None and content_length > API_STREAM_PARSE_THRESHOLD:
+            # Parse while downloading instead of buffering the whole body
+            response.raw.decode_content = True
+            data = _stream_videos(response.raw)
+        else:
+            data = _json_loads(response.content)
+        etag = response.headers.get("ETag")
+    if etag:
+        shared["api_etags"][url] = (etag, data)
+    return data
+
+
+def _search_fields(video: dict) -> dict:
+    """Precompute the lowercased text that searchByTopics matches against."""
+    topics_lc = " ".join(video.get("topics") or []).lower()
+    keywords_lc = " ".join(video.get("keywords") or []).lower()
+    title_lc = (video.get("title") or "").lower()
+    return {
+        "topics_lc": topics_lc,
+        "keywords_lc": keywords_lc,
+        "title_lc": title_lc,
+    }
+
+
+def normalize_video(v: dict) -> dict:
+    """Convert a raw video record into the shape used by the client-side app."""
+    return {
+        "id": v.get("id"),
+        "title": v.get("title"),
+        "topics": v.get("topics", []),
+        "keywords": v.get("keywords", []),
+        "duration": v.get("duration_formatted", ""),
+        "duration_seconds": v.get("duration", 0),
+        "url": v.get("url", ""),
+        "subtitle_file": v.get("subtitle_file"),
+        "transcribed_at": v.get("transcribed_at"),
+        "transcript": sorted(
+            (
+                {
+                    "start": int(seg.get("start", 0)),
+                    "end": int(seg.get("end", 0)),
+                    "text": seg.get("text", ""),
+                }
+                for seg in v.get("transcript", [])
+            ),
+            key=itemgetter("start"),
+        ),
+        **_search_fields(v),
+    }
+
+
+def normalize_videos_data(data: dict) -> dict:
+    """Normalize every video in a raw videos payload."""
+    return {
+        "videos": [normalize_video(v) for v in data.get("videos", [])],
+        "metadata": data.get("metadata", {}),
+    }
+
+
+def _source_stamp(path: Path) -> dict:
+    """Identify a file version by its exact mtime and size."""
+    stat = path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _read_normalized(stamp: dict) -> dict | None:
+    """Return the persisted normalized data if built by this format from this source."""
+    try:
+        cached = _json_loads(VIDEOS_NORMALIZED_FILE.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if cached.get("format") == NORMALIZED_FORMAT_VERSION and cached.get("source") == stamp:
+        return cached.get("data")
+    return None
+
+
+def _content_hash(video: dict) -> str:
+    """Hash a normalized video record, counting the transcript by length only."""
+    record = {key: value for key, value in video.items() if key != "content_hash"}
+    record["transcript"] = len(video.get("transcript") or [])
+    return hashlib.blake2b(_json_dumpb(record), digest_size=16).hexdigest()
+
+
+def _with_content_hashes(data: dict) -> dict:
+    """Store each video's _content_hash under "content_hash" (the HTML cache key)."""
+    for v in data["videos"]:
+        v["content_hash"] = _content_hash(v)
+    return data
 
-@st.cache_data
+
+def _load_local_videos_file() -> dict:
+    """Parse the raw local video data using the fastest available reader."""
+    # Binary copy written by generate_data.py: a _source_stamp of the videos.json
+    # it mirrors, then the data. Used only while that stamp matches exactly.
+    if msgpack is not None and VIDEOS_MSGPACK_FILE.exists():
+        with open(VIDEOS_MSGPACK_FILE, "rb") as f:
+            unpacker = msgpack.Unpacker(f, raw=False, max_buffer_size=0)
+            if next(unpacker, None) == _source_stamp(VIDEOS_FILE):
+                return next(unpacker)
+    if ijson is not None and VIDEOS_FILE.stat().st_size > STREAM_PARSE_THRESHOLD:
+        with open(VIDEOS_FILE, "rb") as f:
+            return _stream_videos(f)
+    return _json_loads(VIDEOS_FILE.read_bytes())
+
+
+@st.cache_resource(ttl=DATA_CACHE_TTL)
 def load_videos_data() -> dict:
-    """Load video data from API or fallback to local JSON file."""
+    """Load normalized video data from API or fallback to local JSON file.
+
+    Cached as a resource so reruns get the same object instead of an unpickled
+    copy of every transcript; callers must not mutate it.
+    """
     # Try to fetch from API first
     if VIDEO_DATA_API_URL:
         try:
-            response = requests.get(VIDEO_DATA_API_URL, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return _with_content_hashes(
+                normalize_videos_data(fetch_videos_from_api(VIDEO_DATA_API_URL))
+            )
         except Exception as e:
             st.warning(f"Failed to fetch from API: {e}. Falling back to local file.")
     
@@ -33,360 +256,422 @@ def load_videos_data() -> dict:
     if not VIDEOS_FILE.exists():
         return {"videos": [], "metadata": {}}
     try:
-        with open(VIDEOS_FILE, encoding="utf-8") as f:
-            return json.load(f)
+        # Normalized copy from an earlier run; rebuilt whenever videos.json or the format changes
+        stamp = _source_stamp(VIDEOS_FILE)
+        cached = _read_normalized(stamp)
+        if cached is not None:
+            return _with_content_hashes(cached)
+        data = normalize_videos_data(_load_local_videos_file())
     except Exception:
         return {"videos": [], "metadata": {}}
 
+    try:
+        VIDEOS_NORMALIZED_FILE.write_bytes(
+            _json_dumpb({"format": NORMALIZED_FORMAT_VERSION, "source": stamp, "data": data})
+        )
+    except OSError:
+        pass
+    return _with_content_hashes(data)
 
-@st.cache_data
+
+@st.cache_data(ttl=DATA_CACHE_TTL)
 def load_system_prompt() -> str:
     """Load system prompt from markdown file."""
     if not SYSTEM_PROMPT_FILE.exists():
         return "Kamu adalah tutor fisika yang ramah dan berpengetahuan untuk anak SD."
     try:
-        with open(SYSTEM_PROMPT_FILE, encoding="utf-8") as f:
-            return f.read()
+        return SYSTEM_PROMPT_FILE.read_text(encoding="utf-8")
     except Exception:
         return "Kamu adalah tutor fisika yang ramah dan berpengetahuan untuk anak SD."
 
 
-def get_subtitle_data(subtitle_file: str | None) -> str | None:
-    """Get base64 encoded subtitle data."""
+def _scan_subtitles() -> dict[str, int]:
+    """Map each "subtitles/<name>" file to its mtime_ns with one directory scan."""
+    try:
+        with os.scandir(SUBTITLES_DIR) as entries:
+            return {
+                f"{SUBTITLES_DIR.name}/{entry.name}": entry.stat().st_mtime_ns
+                for entry in entries
+                if entry.is_file()
+            }
+    except OSError:
+        return {}
+
+
+def get_subtitle_data(
+    subtitle_file: str | None, mtime_ns: int | None = None, cache: dict | None = None
+) -> str | None:
+    """Get base64 encoded subtitle data.
+
+    mtime_ns can be passed when already known (e.g. from _scan_subtitles)
+    to skip the stat call. Worker threads must pass cache (the shared
+    subtitle cache, fetched on the script thread) so they never call
+    Streamlit APIs themselves.
+    """
     if not subtitle_file:
         return None
 
     subtitle_path = DATA_DIR / subtitle_file
-    if subtitle_path.exists():
-        with open(subtitle_path, encoding="utf-8") as f:
-            vtt_content = f.read()
-        encoded = base64.b64encode(vtt_content.encode()).decode()
-        return f"data:text/vtt;base64,{encoded}"
-
-    return None
-
-def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str) -> str:
-    """Generate the complete HTML/JS application."""
-
-    video_info = []
-    for v in videos_data:
-        subtitle_url = get_subtitle_data(v.get("subtitle_file"))
-
-        transcript_segments = v.get("transcript", [])
-        transcript_with_time = []
-        for seg in transcript_segments:
-            start = int(seg.get("start", 0))
-            end = int(seg.get("end", 0))
-            text = seg.get("text", "")
-            transcript_with_time.append({
-                "start": start,
-                "end": end,
-                "text": text
-            })
-
-        video_info.append({
-            "id": v.get("id"),
-            "title": v.get("title"),
-            "topics": v.get("topics", []),
-            "keywords": v.get("keywords", []),
-            "duration": v.get("duration_formatted", ""),
-            "duration_seconds": v.get("duration", 0),
-            "url": v.get("url", ""),
-            "subtitle_url": subtitle_url,
-            "transcript": transcript_with_time,
-        })
-
-    videos_json = json.dumps(video_info, ensure_ascii=False)
-    
-    system_prompt_escaped = system_prompt.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n').replace('\r', '\\r')
-
-    return f"""
+    if mtime_ns is None:
+        try:
+            mtime_ns = subtitle_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    # Cached per path; a changed mtime means the file was rewritten
+    if cache is None:
+        cache = _shared()["subtitle_cache"]
+    cached = cache.get(subtitle_path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+
+    encoded = base64.b64encode(subtitle_path.read_bytes()).decode("ascii")
+    data_url = f"data:text/vtt;base64,{encoded}"
+    cache[subtitle_path] = (mtime_ns, data_url)
+    return data_url
+
+
+_CSS = """
+* {
+    box-sizing: border-box;
+    margin: 0;
+    padding: 0;
+}
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    background: #0f172a;
+    color: #f8fafc;
+}
+
+.app-container {
+    display: flex;
+    gap: 20px;
+    padding: 16px;
+    height: 100vh;
+}
+
+.chat-panel {
+    width: 35%;
+    display: flex;
+    flex-direction: column;
+    gap: 16px;
+}
+
+.panel-title {
+    font-size: 18px;
+    font-weight: 600;
+    color: #f8fafc;
+    display: flex;
+    align-items: center;
+    gap: 8px;
+}
+
+.control-buttons {
+    display: flex;
+    gap: 12px;
+}
+
+.btn {
+    padding: 12px 20px;
+    border: none;
+    border-radius: 12px;
+    font-size: 14px;
+    font-weight: 600;
+    cursor: pointer;
+    transition: all 0.3s ease;
+    display: flex;
+    align-items: center;
+    gap: 8px;
+    flex: 1;
+    justify-content: center;
+}
+
+.btn-start {
+    background: linear-gradient(135deg, #6366f1 0%, #4f46e5 100%);
+    color: white;
+    box-shadow: 0 4px 15px rgba(99, 102, 241, 0.3);
+}
+
+.btn-start:hover:not(:disabled) {
+    transform: translateY(-2px);
+    box-shadow: 0 6px 20px rgba(99, 102, 241, 0.4);
+}
+
+.btn-stop {
+    background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%);
+    color: white;
+    box-shadow: 0 4px 15px rgba(239, 68, 68, 0.3);
+}
+
+.btn-stop:hover:not(:disabled) {
+    transform: translateY(-2px);
+    box-shadow: 0 6px 20px rgba(239, 68, 68, 0.4);
+}
+
+.btn:disabled {
+    opacity: 0.5;
+    cursor: not-allowed;
+    transform: none !important;
+}
+
+.status-indicator {
+    padding: 8px 16px;
+    border-radius: 20px;
+    font-size: 13px;
+    font-weight: 500;
+    display: inline-block;
+    width: fit-content;
+}
+
+.status-disconnected {
+    background: rgba(239, 68, 68, 0.2);
+    color: #ef4444;
+}
+
+.status-connecting {
+    background: rgba(251, 191, 36, 0.2);
+    color: #f59e0b;
+}
+
+.status-connected {
+    background: rgba(34, 197, 94, 0.2);
+    color: #22c55e;
+}
+
+.status-speaking {
+    background: rgba(99, 102, 241, 0.2);
+    color: #6366f1;
+    animation: pulse 1.5s infinite;
+}
+
+@keyframes pulse {
+    0%, 100% { opacity: 1; }
+    50% { opacity: 0.6; }
+}
+
+.transcript-container {
+    background: #1e293b;
+    border-radius: 12px;
+    padding: 16px;
+    flex: 1;
+    overflow-y: auto;
+    display: flex;
+    flex-direction: column;
+}
+
+.transcript-container::-webkit-scrollbar {
+    width: 6px;
+}
+
+.transcript-container::-webkit-scrollbar-track {
+    background: #0f172a;
+    border-radius: 3px;
+}
+
+.transcript-container::-webkit-scrollbar-thumb {
+    background: #475569;
+    border-radius: 3px;
+}
+
+.transcript-title {
+    color: #94a3b8;
+    font-size: 14px;
+    margin-bottom: 12px;
+    font-weight: 600;
+}
+
+.transcripts {
+    display: flex;
+    flex-direction: column;
+    gap: 8px;
+    flex: 1;
+    overflow-y: auto;
+}
+
+.message {
+    padding: 10px 14px;
+    border-radius: 12px;
+    max-width: 90%;
+    word-wrap: break-word;
+    font-size: 14px;
+    line-height: 1.4;
+}
+
+.message-user {
+    background: #6366f1;
+    color: white;
+    align-self: flex-end;
+    border-bottom-right-radius: 4px;
+}
+
+.message-assistant {
+    background: #334155;
+    color: #f8fafc;
+    align-self: flex-start;
+    border-bottom-left-radius: 4px;
+}
+
+.empty-state {
+    color: #64748b;
+    text-align: center;
+    padding: 40px 20px;
+    font-size: 14px;
+}
+
+.video-panel {
+    width: 65%;
+    display: flex;
+    flex-direction: column;
+    gap: 16px;
+}
+
+.video-title {
+    font-size: 18px;
+    font-weight: 600;
+}
+
+.video-meta {
+    color: #94a3b8;
+    font-size: 13px;
+}
+
+.video-container {
+    background: #1e293b;
+    border-radius: 16px;
+    padding: 16px;
+    flex: 1;
+    display: flex;
+    flex-direction: column;
+}
+
+.video-wrapper {
+    flex: 1;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+}
+
+video {
+    width: 100%;
+    max-height: 100%;
+    border-radius: 12px;
+    background: #000;
+}
+
+.welcome-state {
+    display: flex;
+    flex-direction: column;
+    align-items: center;
+    justify-content: center;
+    height: 100%;
+    text-align: center;
+    padding: 40px;
+}
+
+.welcome-icon {
+    font-size: 64px;
+    margin-bottom: 20px;
+}
+
+.welcome-title {
+    font-size: 24px;
+    font-weight: 600;
+    margin-bottom: 12px;
+}
+
+.welcome-text {
+    color: #94a3b8;
+    font-size: 14px;
+    line-height: 1.6;
+    max-width: 400px;
+}
+
+.visualizer {
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    gap: 4px;
+    height: 30px;
+    margin: 8px 0;
+}
+
+.visualizer-bar {
+    width: 4px;
+    height: 30px;
+    background: #6366f1;
+    border-radius: 2px;
+    transform: scaleY(0.2);
+    animation: visualizer-bounce 0.6s ease-in-out infinite alternate;
+}
+
+/* Staggered durations/delays make the bars move independently */
+.visualizer-bar:nth-child(2) {
+    animation-duration: 0.45s;
+    animation-delay: -0.2s;
+}
+
+.visualizer-bar:nth-child(3) {
+    animation-duration: 0.7s;
+    animation-delay: -0.35s;
+}
+
+.visualizer-bar:nth-child(4) {
+    animation-duration: 0.5s;
+    animation-delay: -0.1s;
+}
+
+.visualizer-bar:nth-child(5) {
+    animation-duration: 0.65s;
+    animation-delay: -0.45s;
+}
+
+.visualizer-bar:nth-child(6) {
+    animation-duration: 0.4s;
+    animation-delay: -0.25s;
+}
+
+.visualizer-bar:nth-child(7) {
+    animation-duration: 0.55s;
+    animation-delay: -0.4s;
+}
+
+@keyframes visualizer-bounce {
+    from { transform: scaleY(0.2); }
+    to { transform: scaleY(1); }
+}
+
+.search-info {
+    background: rgba(99, 102, 241, 0.1);
+    border-left: 3px solid #6366f1;
+    padding: 8px 12px;
+    border-radius: 0 8px 8px 0;
+    font-size: 12px;
+    color: #94a3b8;
+    margin-top: 8px;
+}
+"""
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and collapse whitespace in a CSS block."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+# CSS does not depend on runtime data, so it is minified once at import time
+_CSS_MIN = _minify_css(_CSS)
+
+
+_HTML_TEMPLATE = string.Template("""
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
-    <style>
-        * {{
-            box-sizing: border-box;
-            margin: 0;
-            padding: 0;
-        }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: #0f172a;
-            color: #f8fafc;
-        }}
-
-        .app-container {{
-            display: flex;
-            gap: 20px;
-            padding: 16px;
-            height: 100vh;
-        }}
-
-        .chat-panel {{
-            width: 35%;
-            display: flex;
-            flex-direction: column;
-            gap: 16px;
-        }}
-
-        .panel-title {{
-            font-size: 18px;
-            font-weight: 600;
-            color: #f8fafc;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-
-        .control-buttons {{
-            display: flex;
-            gap: 12px;
-        }}
-
-        .btn {{
-            padding: 12px 20px;
-            border: none;
-            border-radius: 12px;
-            font-size: 14px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            flex: 1;
-            justify-content: center;
-        }}
-
-        .btn-start {{
-            background: linear-gradient(135deg, #6366f1 0%, #4f46e5 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(99, 102, 241, 0.3);
-        }}
-
-        .btn-start:hover:not(:disabled) {{
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(99, 102, 241, 0.4);
-        }}
-
-        .btn-stop {{
-            background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(239, 68, 68, 0.3);
-        }}
-
-        .btn-stop:hover:not(:disabled) {{
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(239, 68, 68, 0.4);
-        }}
-
-        .btn:disabled {{
-            opacity: 0.5;
-            cursor: not-allowed;
-            transform: none !important;
-        }}
-
-        .status-indicator {{
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-size: 13px;
-            font-weight: 500;
-            display: inline-block;
-            width: fit-content;
-        }}
-
-        .status-disconnected {{
-            background: rgba(239, 68, 68, 0.2);
-            color: #ef4444;
-        }}
-
-        .status-connecting {{
-            background: rgba(251, 191, 36, 0.2);
-            color: #f59e0b;
-        }}
-
-        .status-connected {{
-            background: rgba(34, 197, 94, 0.2);
-            color: #22c55e;
-        }}
-
-        .status-speaking {{
-            background: rgba(99, 102, 241, 0.2);
-            color: #6366f1;
-            animation: pulse 1.5s infinite;
-        }}
-
-        @keyframes pulse {{
-            0%, 100% {{ opacity: 1; }}
-            50% {{ opacity: 0.6; }}
-        }}
-
-        .transcript-container {{
-            background: #1e293b;
-            border-radius: 12px;
-            padding: 16px;
-            flex: 1;
-            overflow-y: auto;
-            display: flex;
-            flex-direction: column;
-        }}
-
-        .transcript-container::-webkit-scrollbar {{
-            width: 6px;
-        }}
-
-        .transcript-container::-webkit-scrollbar-track {{
-            background: #0f172a;
-            border-radius: 3px;
-        }}
-
-        .transcript-container::-webkit-scrollbar-thumb {{
-            background: #475569;
-            border-radius: 3px;
-        }}
-
-        .transcript-title {{
-            color: #94a3b8;
-            font-size: 14px;
-            margin-bottom: 12px;
-            font-weight: 600;
-        }}
-
-        .transcripts {{
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
-            flex: 1;
-            overflow-y: auto;
-        }}
-
-        .message {{
-            padding: 10px 14px;
-            border-radius: 12px;
-            max-width: 90%;
-            word-wrap: break-word;
-            font-size: 14px;
-            line-height: 1.4;
-        }}
-
-        .message-user {{
-            background: #6366f1;
-            color: white;
-            align-self: flex-end;
-            border-bottom-right-radius: 4px;
-        }}
-
-        .message-assistant {{
-            background: #334155;
-            color: #f8fafc;
-            align-self: flex-start;
-            border-bottom-left-radius: 4px;
-        }}
-
-        .empty-state {{
-            color: #64748b;
-            text-align: center;
-            padding: 40px 20px;
-            font-size: 14px;
-        }}
-
-        .video-panel {{
-            width: 65%;
-            display: flex;
-            flex-direction: column;
-            gap: 16px;
-        }}
-
-        .video-title {{
-            font-size: 18px;
-            font-weight: 600;
-        }}
-
-        .video-meta {{
-            color: #94a3b8;
-            font-size: 13px;
-        }}
-
-        .video-container {{
-            background: #1e293b;
-            border-radius: 16px;
-            padding: 16px;
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-        }}
-
-        .video-wrapper {{
-            flex: 1;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-
-        video {{
-            width: 100%;
-            max-height: 100%;
-            border-radius: 12px;
-            background: #000;
-        }}
-
-        .welcome-state {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            height: 100%;
-            text-align: center;
-            padding: 40px;
-        }}
-
-        .welcome-icon {{
-            font-size: 64px;
-            margin-bottom: 20px;
-        }}
-
-        .welcome-title {{
-            font-size: 24px;
-            font-weight: 600;
-            margin-bottom: 12px;
-        }}
-
-        .welcome-text {{
-            color: #94a3b8;
-            font-size: 14px;
-            line-height: 1.6;
-            max-width: 400px;
-        }}
-
-        .visualizer {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 4px;
-            height: 30px;
-            margin: 8px 0;
-        }}
-
-        .visualizer-bar {{
-            width: 4px;
-            background: #6366f1;
-            border-radius: 2px;
-            transition: height 0.1s ease;
-        }}
-
-        .search-info {{
-            background: rgba(99, 102, 241, 0.1);
-            border-left: 3px solid #6366f1;
-            padding: 8px 12px;
-            border-radius: 0 8px 8px 0;
-            font-size: 12px;
-            color: #94a3b8;
-            margin-top: 8px;
-        }}
-    </style>
+    <style>""" + _CSS_MIN + """</style>
 </head>
 <body>
     <div class="app-container">
@@ -407,13 +692,13 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
             </div>
 
             <div class="visualizer" id="visualizer" style="display: none;">
-                <div class="visualizer-bar" style="height: 8px;"></div>
-                <div class="visualizer-bar" style="height: 16px;"></div>
-                <div class="visualizer-bar" style="height: 12px;"></div>
-                <div class="visualizer-bar" style="height: 20px;"></div>
-                <div class="visualizer-bar" style="height: 14px;"></div>
-                <div class="visualizer-bar" style="height: 18px;"></div>
-                <div class="visualizer-bar" style="height: 10px;"></div>
+                <div class="visualizer-bar"></div>
+                <div class="visualizer-bar"></div>
+                <div class="visualizer-bar"></div>
+                <div class="visualizer-bar"></div>
+                <div class="visualizer-bar"></div>
+                <div class="visualizer-bar"></div>
+                <div class="visualizer-bar"></div>
             </div>
 
             <div class="transcript-container">
@@ -452,9 +737,11 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
     </div>
 
     <script>
-    const API_KEY = '{api_key}';
-    const VIDEOS_DATA = {videos_json};
-    const SYSTEM_PROMPT = '{system_prompt_escaped}';
+    const API_KEY = $api_key;
+    const VIDEOS_DATA = $videos_json;
+    const TRANSCRIPTS = $transcripts;
+    const SEARCH_INDEX = $search_index;
+    const SYSTEM_PROMPT = $system_prompt;
 
     let peerConnection = null;
     let dataChannel = null;
@@ -474,12 +761,12 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
     const videoMetaEl = document.getElementById('videoMeta');
     const searchInfoEl = document.getElementById('searchInfo');
 
-    function updateStatus(status, text) {{
+    function updateStatus(status, text) {
         statusEl.className = 'status-indicator status-' + status;
         statusEl.textContent = text;
-    }}
+    }
 
-    function addTranscript(role, text) {{
+    function addTranscript(role, text) {
         const emptyState = transcriptsEl.querySelector('.empty-state');
         if (emptyState) emptyState.remove();
 
@@ -488,23 +775,9 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
         msgDiv.textContent = text;
         transcriptsEl.appendChild(msgDiv);
         transcriptsEl.scrollTop = transcriptsEl.scrollHeight;
-    }}
-
-    function animateVisualizer() {{
-        if (!isConnected) return;
+    }
 
-        const bars = visualizerEl.querySelectorAll('.visualizer-bar');
-        bars.forEach(bar => {{
-            const height = Math.random() * 25 + 5;
-            bar.style.height = height + 'px';
-        }});
-
-        requestAnimationFrame(() => {{
-            setTimeout(animateVisualizer, 100);
-        }});
-    }}
-
-    function showVideo(videoData, timestamp = 0) {{
+    function showVideo(videoData, timestamp = 0) {
         if (!videoData || !videoData.url) return;
 
         currentVideoId = videoData.id;
@@ -517,11 +790,11 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
 
         videoEl.src = videoData.url;
 
-        while (videoEl.firstChild) {{
+        while (videoEl.firstChild) {
             videoEl.removeChild(videoEl.firstChild);
-        }}
+        }
 
-        if (videoData.subtitle_url) {{
+        if (videoData.subtitle_url) {
             const track = document.createElement('track');
             track.kind = 'subtitles';
             track.src = videoData.subtitle_url;
@@ -529,118 +802,145 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
             track.label = 'Indonesian';
             track.default = true;
             videoEl.appendChild(track);
-        }}
+        }
 
         videoEl.load();
-        videoEl.addEventListener('loadedmetadata', function onLoad() {{
+        videoEl.addEventListener('loadedmetadata', function onLoad() {
             videoEl.currentTime = timestamp;
             videoEl.play().catch(e => console.log('Autoplay prevented'));
-            if (videoEl.textTracks.length > 0) {{
+            if (videoEl.textTracks.length > 0) {
                 videoEl.textTracks[0].mode = 'showing';
-            }}
+            }
             videoEl.removeEventListener('loadedmetadata', onLoad);
-        }});
-    }}
+        });
+    }
 
-    function navigateToTimestamp(timestamp) {{
-        if (videoEl.src) {{
+    function navigateToTimestamp(timestamp) {
+        if (videoEl.src) {
             videoEl.currentTime = timestamp;
             videoEl.play().catch(e => console.log('Autoplay prevented'));
-        }}
-    }}
+        }
+    }
 
-    function sendFunctionResult(callId, result) {{
-        if (dataChannel && dataChannel.readyState === 'open') {{
-            const event = {{
+    function sendFunctionResult(callId, result) {
+        if (dataChannel && dataChannel.readyState === 'open') {
+            const event = {
                 type: 'conversation.item.create',
-                item: {{
+                item: {
                     type: 'function_call_output',
                     call_id: callId,
                     output: JSON.stringify(result)
-                }}
-            }};
+                }
+            };
             dataChannel.send(JSON.stringify(event));
-            dataChannel.send(JSON.stringify({{ type: 'response.create' }}));
-        }}
-    }}
+            dataChannel.send(JSON.stringify({ type: 'response.create' }));
+        }
+    }
 
-    function handleNavigateVideo(args, callId) {{
+    function handleNavigateVideo(args, callId) {
         const timestamp = args.timestamp || 0;
         const videoId = args.video_id;
 
         console.log('Navigate video:', videoId, 'timestamp:', timestamp);
 
-        if (videoId && videoId !== currentVideoId) {{
+        if (videoId && videoId !== currentVideoId) {
             const video = VIDEOS_DATA.find(v => v.id === videoId);
-            if (video) {{
+            if (video) {
                 showVideo(video, timestamp);
-            }}
-        }} else {{
+            }
+        } else {
             navigateToTimestamp(timestamp);
-        }}
+        }
 
-        sendFunctionResult(callId, {{
+        sendFunctionResult(callId, {
             success: true,
             message: 'Video berpindah ke detik ' + timestamp
-        }});
-    }}
+        });
+    }
+
+    // Field bits used in SEARCH_INDEX postings, with their score weights
+    const FIELD_WEIGHTS = [[1, 10], [2, 8], [4, 15]];
+    // Score reported for a query that matches exactly one video title
+    const TITLE_MATCH_SCORE = 100;
 
-    function searchByTopics(query) {{
-        if (!query || !VIDEOS_DATA || VIDEOS_DATA.length === 0) {{
+    function searchByTopics(query) {
+        if (!query || !VIDEOS_DATA || VIDEOS_DATA.length === 0) {
             return [];
-        }}
+        }
 
-        const queryLower = query.toLowerCase();
+        const queryLower = query.toLowerCase().trim();
         const queryWords = queryLower.split(/\\s+/).filter(w => w.length > 1);
 
-        const scored = VIDEOS_DATA.map(video => {{
-            let score = 0;
-
-            const topics = (video.topics || []).join(' ').toLowerCase();
-            const keywords = (video.keywords || []).join(' ').toLowerCase();
-            const title = (video.title || '').toLowerCase();
-            const allText = topics + ' ' + keywords + ' ' + title;
-
-            if (allText.includes(queryLower)) {{
-                score += 20;
-            }}
-
-            queryWords.forEach(word => {{
-                if (topics.includes(word)) {{
-                    score += 10;
-                }}
-
-                if (keywords.includes(word)) {{
-                    score += 8;
-                }}
-
-                if (title.includes(word)) {{
-                    score += 15;
-                }}
-
-                const allWords = allText.split(/\\s+/);
-                allWords.forEach(w => {{
-                    if (w.startsWith(word) && w !== word) {{
-                        score += 3;
-                    }}
-                }});
-            }});
-
-            return {{ ...video, score }};
-        }});
+        // A query found in exactly one title is taken as the answer outright
+        let titleHit = null;
+        for (const video of VIDEOS_DATA) {
+            if (queryLower.length > 1 && video.title_lc.includes(queryLower)) {
+                if (titleHit) {
+                    titleHit = null;
+                    break;
+                }
+                titleHit = video;
+            }
+        }
+        if (titleHit) {
+            return [{ ...titleHit, score: TITLE_MATCH_SCORE }];
+        }
 
-        return scored
-            .filter(v => v.score > 0)
+        const scores = new Map();
+        const wordsMatched = new Map();
+
+        queryWords.forEach(word => {
+            // Candidate tokens share the word's rarest n-gram
+            const n = SEARCH_INDEX.gram_len;
+            let bucket = null;
+            for (let i = 0; i + n <= word.length; i++) {
+                const tokens = SEARCH_INDEX.grams[word.slice(i, i + n)] || [];
+                if (!bucket || tokens.length < bucket.length) bucket = tokens;
+                if (bucket.length === 0) break;
+            }
+
+            // Collect, per video, the fields containing this word and how many
+            // tokens start with it while being longer than it
+            const hits = new Map();
+            bucket.forEach(token => {
+                if (!token.includes(word)) return;
+                const isPrefix = token !== word && token.startsWith(word);
+                SEARCH_INDEX.tokens[token].forEach(([idx, mask, count]) => {
+                    const hit = hits.get(idx) || { mask: 0, prefix: 0 };
+                    hit.mask |= mask;
+                    if (isPrefix) hit.prefix += count;
+                    hits.set(idx, hit);
+                });
+            });
+
+            hits.forEach((hit, idx) => {
+                let score = scores.get(idx) || 0;
+                FIELD_WEIGHTS.forEach(([bit, weight]) => {
+                    if (hit.mask & bit) score += weight;
+                });
+                scores.set(idx, score + 3 * hit.prefix);
+                wordsMatched.set(idx, (wordsMatched.get(idx) || 0) + 1);
+            });
+        });
+
+        // Bonus for videos matching every query word
+        wordsMatched.forEach((matched, idx) => {
+            if (matched === queryWords.length) {
+                scores.set(idx, scores.get(idx) + 20);
+            }
+        });
+
+        return Array.from(scores, ([idx, score]) => ({ ...VIDEOS_DATA[idx], score }))
             .sort((a, b) => b.score - a.score);
-    }}
+    }
 
-    function handleSearchVideo(args, callId) {{
+    function handleSearchVideo(args, callId) {
         const query = args.query || '';
         console.log('Topic-based search:', query);
 
         const results = searchByTopics(query);
 
-        if (results.length > 0) {{
+        if (results.length > 0) {
             const best = results[0];
             console.log('Best match:', best.title, 'score:', best.score);
 
@@ -650,172 +950,218 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
             const topicsPreview = (best.topics || []).slice(0, 5).join(', ');
             searchInfoEl.innerHTML = '🔍 <b>Ditemukan:</b> ' + best.title + ' (Topics: ' + topicsPreview + ')';
 
-            sendFunctionResult(callId, {{
+            sendFunctionResult(callId, {
                 success: true,
                 video_id: best.id,
                 title: best.title,
                 topics: best.topics,
                 score: best.score,
                 message: 'Menemukan video: ' + best.title + '. Video ini membahas tentang: ' + topicsPreview
-            }});
-        }} else {{
-            sendFunctionResult(callId, {{
+            });
+        } else {
+            sendFunctionResult(callId, {
                 success: false,
                 message: 'Tidak menemukan video yang relevan untuk: ' + query + '. Coba kata kunci lain.'
-            }});
-        }}
-    }}
+            });
+        }
+    }
+
+    // Index of the first segment ending at or after time (transcript is sorted by start)
+    function lowerBound(segments, time) {
+        let lo = 0;
+        let hi = segments.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (segments[mid].end < time) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        return lo;
+    }
 
-    function handleGetVideoContent(args, callId) {{
-        const timestamp = args.timestamp || 0;
-        const videoId = args.video_id || currentVideoId;
+    // Transcripts ship as base64 zlib blobs and are inflated on first use
+    const transcriptCache = new Map();
 
-        console.log('Get video content at:', timestamp, 'for video:', videoId);
+    async function getTranscript(videoId) {
+        if (transcriptCache.has(videoId)) {
+            return transcriptCache.get(videoId);
+        }
 
-        const video = VIDEOS_DATA.find(v => v.id === videoId);
-        if (!video) {{
-            sendFunctionResult(callId, {{
+        let transcript = [];
+        const blob = TRANSCRIPTS[videoId];
+        if (blob) {
+            const bytes = Uint8Array.from(atob(blob), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+            transcript = JSON.parse(await new Response(stream).text());
+        }
+        transcriptCache.set(videoId, transcript);
+        return transcript;
+    }
+
+    async function handleGetVideoContent(args, callId) {
+        try {
+            const timestamp = args.timestamp || 0;
+            const videoId = args.video_id || currentVideoId;
+
+            console.log('Get video content at:', timestamp, 'for video:', videoId);
+
+            const video = VIDEOS_DATA.find(v => v.id === videoId);
+            if (!video) {
+                sendFunctionResult(callId, {
+                    success: false,
+                    message: 'Video tidak ditemukan'
+                });
+                return;
+            }
+
+            const startRange = Math.max(0, timestamp - 10);
+            const endRange = timestamp + 10;
+
+            const transcript = await getTranscript(video.id);
+            const first = lowerBound(transcript, startRange);
+            const relevantSegments = [];
+            for (let i = first; i < transcript.length && transcript[i].start <= endRange; i++) {
+                relevantSegments.push(transcript[i]);
+            }
+
+            if (relevantSegments.length === 0) {
+                // No overlap: the closest segment is one of the two around the window
+                let closestSeg = null;
+                let minDist = Infinity;
+                [transcript[first - 1], transcript[first]].forEach(seg => {
+                    if (!seg) return;
+                    const dist = Math.min(Math.abs(seg.start - timestamp), Math.abs(seg.end - timestamp));
+                    if (dist < minDist) {
+                        minDist = dist;
+                        closestSeg = seg;
+                    }
+                });
+
+                if (closestSeg) {
+                    relevantSegments.push(closestSeg);
+                }
+            }
+
+            let contentText = '';
+            relevantSegments.forEach(seg => {
+                contentText += '[' + formatTime(seg.start) + '-' + formatTime(seg.end) + '] ' + seg.text + '\\n';
+            });
+
+            navigateToTimestamp(timestamp);
+
+            sendFunctionResult(callId, {
+                success: true,
+                video_id: videoId,
+                video_title: video.title,
+                timestamp: timestamp,
+                content: contentText || 'Tidak ada konten di timestamp ini',
+                segments: relevantSegments,
+                message: 'Konten video di detik ' + timestamp + ': ' + contentText
+            });
+        } catch (err) {
+            // Always answer the tool call, or the Realtime session waits forever
+            console.error('Get video content failed:', err);
+            sendFunctionResult(callId, {
                 success: false,
-                message: 'Video tidak ditemukan'
-            }});
-            return;
-        }}
-
-        const startRange = Math.max(0, timestamp - 10);
-        const endRange = timestamp + 10;
-
-        const relevantSegments = (video.transcript || []).filter(seg => {{
-            return (seg.start >= startRange && seg.start <= endRange) ||
-                   (seg.end >= startRange && seg.end <= endRange) ||
-                   (seg.start <= startRange && seg.end >= endRange);
-        }});
-
-        if (relevantSegments.length === 0) {{
-            let closestSeg = null;
-            let minDist = Infinity;
-            (video.transcript || []).forEach(seg => {{
-                const dist = Math.min(Math.abs(seg.start - timestamp), Math.abs(seg.end - timestamp));
-                if (dist < minDist) {{
-                    minDist = dist;
-                    closestSeg = seg;
-                }}
-            }});
-
-            if (closestSeg) {{
-                relevantSegments.push(closestSeg);
-            }}
-        }}
-
-        let contentText = '';
-        relevantSegments.forEach(seg => {{
-            contentText += '[' + formatTime(seg.start) + '-' + formatTime(seg.end) + '] ' + seg.text + '\\n';
-        }});
-
-        navigateToTimestamp(timestamp);
-
-        sendFunctionResult(callId, {{
-            success: true,
-            video_id: videoId,
-            video_title: video.title,
-            timestamp: timestamp,
-            content: contentText || 'Tidak ada konten di timestamp ini',
-            segments: relevantSegments,
-            message: 'Konten video di detik ' + timestamp + ': ' + contentText
-        }});
-    }}
-
-    function formatTime(seconds) {{
+                message: 'Gagal memuat transkrip video'
+            });
+        }
+    }
+
+    function formatTime(seconds) {
         const mins = Math.floor(seconds / 60);
         const secs = Math.floor(seconds % 60);
         return mins + ':' + secs.toString().padStart(2, '0');
-    }}
+    }
 
     // Trigger AI to greet first
-    function triggerAIGreeting() {{
-        if (dataChannel && dataChannel.readyState === 'open') {{
+    function triggerAIGreeting() {
+        if (dataChannel && dataChannel.readyState === 'open') {
             // Send a message to trigger AI's first response
-            const event = {{
+            const event = {
                 type: 'conversation.item.create',
-                item: {{
+                item: {
                     type: 'message',
                     role: 'user',
                     content: [
-                        {{
+                        {
                             type: 'input_text',
                             text: '[SYSTEM: User just connected. Please greet them warmly in Indonesian and ask what physics topic they want to learn today.]'
-                        }}
+                        }
                     ]
-                }}
-            }};
+                }
+            };
             dataChannel.send(JSON.stringify(event));
-            dataChannel.send(JSON.stringify({{ type: 'response.create' }}));
-        }}
-    }}
+            dataChannel.send(JSON.stringify({ type: 'response.create' }));
+        }
+    }
 
-    async function startConversation() {{
-        try {{
+    async function startConversation() {
+        try {
             updateStatus('connecting', '🟡 Menghubungkan...');
             startBtn.disabled = true;
 
-            const tokenResponse = await fetch('https://api.openai.com/v1/realtime/sessions', {{
+            const tokenResponse = await fetch('https://api.openai.com/v1/realtime/sessions', {
                 method: 'POST',
-                headers: {{
+                headers: {
                     'Authorization': 'Bearer ' + API_KEY,
                     'Content-Type': 'application/json'
-                }},
-                body: JSON.stringify({{
+                },
+                body: JSON.stringify({
                     model: 'gpt-4o-realtime-preview-2024-12-17',
                     voice: 'alloy',
                     instructions: SYSTEM_PROMPT,
                     tools: [
-                        {{
+                        {
                             type: 'function',
                             name: 'navigate_video',
                             description: 'Navigasi video ke timestamp tertentu. Panggil ini saat user minta pindah ke detik/menit tertentu.',
-                            parameters: {{
+                            parameters: {
                                 type: 'object',
-                                properties: {{
-                                    video_id: {{ type: 'string', description: 'ID video (opsional)' }},
-                                    timestamp: {{ type: 'integer', description: 'Waktu dalam detik', minimum: 0 }}
-                                }},
+                                properties: {
+                                    video_id: { type: 'string', description: 'ID video (opsional)' },
+                                    timestamp: { type: 'integer', description: 'Waktu dalam detik', minimum: 0 }
+                                },
                                 required: ['timestamp']
-                            }}
-                        }},
-                        {{
+                            }
+                        },
+                        {
                             type: 'function',
                             name: 'search_video',
                             description: 'Cari video berdasarkan topik/kata kunci. WAJIB panggil ini saat user minta belajar topik baru.',
-                            parameters: {{
+                            parameters: {
                                 type: 'object',
-                                properties: {{
-                                    query: {{ type: 'string', description: 'Kata kunci pencarian topik fisika' }}
-                                }},
+                                properties: {
+                                    query: { type: 'string', description: 'Kata kunci pencarian topik fisika' }
+                                },
                                 required: ['query']
-                            }}
-                        }},
-                        {{
+                            }
+                        },
+                        {
                             type: 'function',
                             name: 'get_video_content',
                             description: 'Dapatkan isi/konten video di timestamp tertentu. WAJIB panggil ini saat user bertanya tentang apa yang dibahas di detik/menit tertentu.',
-                            parameters: {{
+                            parameters: {
                                 type: 'object',
-                                properties: {{
-                                    video_id: {{ type: 'string', description: 'ID video (opsional)' }},
-                                    timestamp: {{ type: 'integer', description: 'Waktu dalam detik', minimum: 0 }}
-                                }},
+                                properties: {
+                                    video_id: { type: 'string', description: 'ID video (opsional)' },
+                                    timestamp: { type: 'integer', description: 'Waktu dalam detik', minimum: 0 }
+                                },
                                 required: ['timestamp']
-                            }}
-                        }}
+                            }
+                        }
                     ],
-                    input_audio_transcription: {{ model: 'whisper-1' }},
-                    turn_detection: {{ type: 'server_vad' }}
-                }})
-            }});
+                    input_audio_transcription: { model: 'whisper-1' },
+                    turn_detection: { type: 'server_vad' }
+                })
+            });
 
-            if (!tokenResponse.ok) {{
+            if (!tokenResponse.ok) {
                 const errorText = await tokenResponse.text();
                 throw new Error('Failed to get session: ' + errorText);
-            }}
+            }
 
             const sessionData = await tokenResponse.json();
             const ephemeralKey = sessionData.client_secret.value;
@@ -825,114 +1171,115 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
             audioElement = document.createElement('audio');
             audioElement.autoplay = true;
 
-            peerConnection.ontrack = (event) => {{
+            peerConnection.ontrack = (event) => {
                 audioElement.srcObject = event.streams[0];
-            }};
+            };
 
-            mediaStream = await navigator.mediaDevices.getUserMedia({{
-                audio: {{
+            mediaStream = await navigator.mediaDevices.getUserMedia({
+                audio: {
                     echoCancellation: true,
                     noiseSuppression: true,
                     autoGainControl: true
-                }}
-            }});
+                }
+            });
 
-            mediaStream.getTracks().forEach(track => {{
+            mediaStream.getTracks().forEach(track => {
                 peerConnection.addTrack(track, mediaStream);
-            }});
+            });
 
             dataChannel = peerConnection.createDataChannel('oai-events');
 
-            dataChannel.onopen = () => {{
+            dataChannel.onopen = () => {
                 console.log('Data channel opened');
                 isConnected = true;
                 updateStatus('connected', '🟢 Terhubung - AI sedang menyapa Anda...');
                 stopBtn.disabled = false;
                 visualizerEl.style.display = 'flex';
-                animateVisualizer();
                 
                 // TRIGGER AI TO GREET FIRST
-                setTimeout(() => {{
+                setTimeout(() => {
                     triggerAIGreeting();
-                }}, 500);
-            }};
+                }, 500);
+            };
 
-            dataChannel.onmessage = (event) => {{
+            dataChannel.onmessage = (event) => {
                 const data = JSON.parse(event.data);
                 handleServerEvent(data);
-            }};
+            };
 
-            dataChannel.onclose = () => {{
+            dataChannel.onclose = () => {
                 console.log('Data channel closed');
                 isConnected = false;
-            }};
+                // The bars are a CSS animation; hiding them is what stops it
+                visualizerEl.style.display = 'none';
+            };
 
             const offer = await peerConnection.createOffer();
             await peerConnection.setLocalDescription(offer);
 
-            const sdpResponse = await fetch('https://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-12-17', {{
+            const sdpResponse = await fetch('https://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-12-17', {
                 method: 'POST',
-                headers: {{
+                headers: {
                     'Authorization': 'Bearer ' + ephemeralKey,
                     'Content-Type': 'application/sdp'
-                }},
+                },
                 body: offer.sdp
-            }});
+            });
 
-            if (!sdpResponse.ok) {{
+            if (!sdpResponse.ok) {
                 throw new Error('Failed to connect to Realtime API');
-            }}
+            }
 
             const answerSdp = await sdpResponse.text();
-            await peerConnection.setRemoteDescription({{
+            await peerConnection.setRemoteDescription({
                 type: 'answer',
                 sdp: answerSdp
-            }});
+            });
 
-        }} catch (error) {{
+        } catch (error) {
             console.error('Error starting conversation:', error);
             updateStatus('disconnected', '🔴 Error: ' + error.message);
             startBtn.disabled = false;
             stopBtn.disabled = true;
-        }}
-    }}
+        }
+    }
 
-    function handleServerEvent(event) {{
+    function handleServerEvent(event) {
         console.log('Server event:', event.type);
 
-        switch (event.type) {{
+        switch (event.type) {
             case 'conversation.item.input_audio_transcription.completed':
-                if (event.transcript) {{
+                if (event.transcript) {
                     addTranscript('user', event.transcript);
-                }}
+                }
                 break;
 
             case 'response.audio_transcript.done':
-                if (event.transcript) {{
+                if (event.transcript) {
                     addTranscript('assistant', event.transcript);
-                }}
+                }
                 break;
 
             case 'response.function_call_arguments.done':
                 const funcName = event.name;
                 const callId = event.call_id;
-                let args = {{}};
+                let args = {};
 
-                try {{
-                    args = JSON.parse(event.arguments || '{{}}');
-                }} catch (e) {{
+                try {
+                    args = JSON.parse(event.arguments || '{}');
+                } catch (e) {
                     console.error('Failed to parse function args:', e);
-                }}
+                }
 
                 console.log('Function call:', funcName, args);
 
-                if (funcName === 'navigate_video') {{
+                if (funcName === 'navigate_video') {
                     handleNavigateVideo(args, callId);
-                }} else if (funcName === 'search_video') {{
+                } else if (funcName === 'search_video') {
                     handleSearchVideo(args, callId);
-                }} else if (funcName === 'get_video_content') {{
+                } else if (funcName === 'get_video_content') {
                     handleGetVideoContent(args, callId);
-                }}
+                }
                 break;
 
             case 'input_audio_buffer.speech_started':
@@ -951,42 +1298,144 @@ def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str)
                 console.error('API Error:', event.error);
                 updateStatus('disconnected', '🔴 Error: ' + (event.error?.message || 'Unknown'));
                 break;
-        }}
-    }}
+        }
+    }
 
-    function stopConversation() {{
+    function stopConversation() {
         isConnected = false;
 
-        if (dataChannel) {{
+        if (dataChannel) {
             dataChannel.close();
             dataChannel = null;
-        }}
+        }
 
-        if (peerConnection) {{
+        if (peerConnection) {
             peerConnection.close();
             peerConnection = null;
-        }}
+        }
 
-        if (mediaStream) {{
+        if (mediaStream) {
             mediaStream.getTracks().forEach(track => track.stop());
             mediaStream = null;
-        }}
+        }
 
-        if (audioElement) {{
+        if (audioElement) {
             audioElement.srcObject = null;
             audioElement = null;
-        }}
+        }
 
         updateStatus('disconnected', '🔴 Tidak terhubung');
         startBtn.disabled = false;
         stopBtn.disabled = true;
         visualizerEl.style.display = 'none';
-    }}
+    }
 
     </script>
 </body>
 </html>
+""")
+
+
+def _to_js_literal(value) -> str:
+    """Serialize a value as a JS literal that is safe inside a <script> tag."""
+    return _json_dumps(value).replace("</", "<\\/")
+
+
+@st.cache_data(show_spinner=False)
+def _system_prompt_js(system_prompt: str) -> str:
+    """Encode the system prompt as a JS string literal (cached per prompt)."""
+    return _to_js_literal(system_prompt)
+
+
+def _videos_cache_key(videos_data: list[dict]) -> tuple:
+    """Cheap cache key for a video list (avoids deep-hashing every transcript).
+
+    Uses the content hashes precomputed by load_videos_data, so any edit to a
+    record other than its transcript text changes the key.
+    """
+    return tuple(v.get("content_hash") or _content_hash(v) for v in videos_data)
+
+
+def _build_search_index(video_info: list[dict]) -> dict:
+    """Build the inverted index used by searchByTopics.
+
+    ``tokens`` maps each lowercased token to ``[video_idx, field_mask, count]``
+    postings (mask bits: 1 = topics, 2 = keywords, 4 = title). ``grams``
+    maps every SEARCH_GRAM_LEN-character substring to the tokens containing
+    it, so substring lookups (e.g. "cepat" in "percepatan") only scan tokens
+    that can match.
+    """
+    postings = defaultdict(dict)
+    for idx, v in enumerate(video_info):
+        for field, bit in (("topics_lc", 1), ("keywords_lc", 2), ("title_lc", 4)):
+            for token in v[field].split():
+                posting = postings[token].setdefault(idx, [idx, 0, 0])
+                posting[1] |= bit
+                posting[2] += 1
+
+    grams = defaultdict(list)
+    for token in postings:
+        for gram in dict.fromkeys(
+            token[i:i + SEARCH_GRAM_LEN] for i in range(len(token) - SEARCH_GRAM_LEN + 1)
+        ):
+            grams[gram].append(token)
+
+    return {
+        "gram_len": SEARCH_GRAM_LEN,
+        "tokens": {token: list(p.values()) for token, p in postings.items()},
+        "grams": grams,
+    }
+
+
+def _compress_transcript(transcript: list[dict]) -> str:
+    """zlib-compress a transcript's JSON and base64 it for lazy inflation in JS."""
+    return base64.b64encode(zlib.compress(_json_dumpb(transcript))).decode("ascii")
+
+
+# TTL so rewritten subtitle files (not part of the key) are picked up too
+@st.cache_data(show_spinner=False, ttl=DATA_CACHE_TTL, hash_funcs={list: _videos_cache_key})
+def _build_client_data(videos_data: list[dict]) -> tuple[str, str, str]:
+    """Serialize the client-side video list, transcripts and search index as JS literals.
+
+    Expects videos already normalized by load_videos_data. Only CLIENT_FIELDS
+    are sent up-front; transcripts are sent as compressed blobs keyed by id.
     """
+    # Stat all subtitles with one scandir, then read/encode uncached ones in parallel
+    subtitle_mtimes = _scan_subtitles()
+    subtitle_cache = _shared()["subtitle_cache"]
+    subtitle_files = [v.get("subtitle_file") for v in videos_data]
+    with ThreadPoolExecutor(max_workers=SUBTITLE_READ_WORKERS) as pool:
+        subtitle_urls = pool.map(
+            lambda name: get_subtitle_data(name, subtitle_mtimes.get(name), subtitle_cache),
+            subtitle_files,
+        )
+        video_info = [
+            {**{key: v.get(key) for key in CLIENT_FIELDS}, "subtitle_url": url}
+            for v, url in zip(videos_data, subtitle_urls)
+        ]
+    transcripts = {
+        v.get("id"): _compress_transcript(v["transcript"])
+        for v in videos_data
+        if v.get("transcript")
+    }
+    return (
+        _to_js_literal(video_info),
+        _to_js_literal(transcripts),
+        _to_js_literal(_build_search_index(video_info)),
+    )
+
+
+@st.cache_data(show_spinner=False, ttl=DATA_CACHE_TTL, hash_funcs={list: _videos_cache_key})
+def get_full_app_html(api_key: str, videos_data: list[dict], system_prompt: str) -> str:
+    """Generate the complete HTML/JS application."""
+    videos_json, transcripts, search_index = _build_client_data(videos_data)
+    return _HTML_TEMPLATE.substitute(
+        api_key=_to_js_literal(api_key),
+        videos_json=videos_json,
+        transcripts=transcripts,
+        search_index=search_index,
+        system_prompt=_system_prompt_js(system_prompt),
+    )
 
 
 def main():
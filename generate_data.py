@@ -9,17 +9,41 @@ Usage:
     uv run python generate_data.py
 """
 
+import heapq
+import importlib.util
+import io
+import itertools
 import json
+import math
 import os
+import re
+import shutil
+import subprocess
 import tempfile
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 
 import time
 
+import certifi
+import urllib3
 from dotenv import load_dotenv
 from minio import Minio
 from openai import OpenAI
+from tqdm import tqdm  # worker threads log via tqdm.write so the progress bar stays intact
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +51,7 @@ load_dotenv()
 # Configuration
 DATA_DIR = Path("data")
 VIDEOS_FILE = DATA_DIR / "videos.json"
+VIDEOS_MSGPACK_FILE = DATA_DIR / "videos.msgpack"
 SUBTITLES_DIR = DATA_DIR / "subtitles"
 
 # MinIO Configuration
@@ -37,15 +62,71 @@ MINIO_BUCKET = os.getenv("MINIO_BUCKET", "physics-videos")
 MINIO_VIDEOS_PATH = os.getenv("MINIO_VIDEOS_PATH", "")
 MINIO_SECURE = os.getenv("MINIO_SECURE", "true").lower() == "true"
 MAX_VIDEOS = int(os.getenv("MAX_VIDEOS", "0"))  # 0 = no limit
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "6"))  # videos processed in parallel
+# Videos up to this size are uploaded from memory; larger ones go via a temp file
+MAX_IN_MEMORY_BYTES = 200 * 1024 * 1024
+# With ffmpeg installed only the audio track is uploaded to Whisper
+FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
+# Audio longer than LONG_AUDIO_SECONDS is transcribed in overlapping chunks
+LONG_AUDIO_SECONDS = 15 * 60
+CHUNK_SECONDS = 10 * 60
+CHUNK_OVERLAP_SECONDS = 5
+CHUNK_WORKERS = 4
+# Transcribe on this machine with faster-whisper instead of the Whisper API
+LOCAL_WHISPER = os.getenv("LOCAL_WHISPER", "false").lower() == "true"
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "large-v3")
+# Opt-in: multi-video runs extract metadata through one Batch API job (50% cheaper)
+METADATA_BATCH = os.getenv("METADATA_BATCH", "false").lower() == "true"
+BATCH_POLL_SECONDS = 30
+# Unfinished batches are cancelled after this long and retried synchronously
+BATCH_MAX_WAIT_SECONDS = int(os.getenv("METADATA_BATCH_MAX_WAIT", str(2 * 60 * 60)))
+
+# Structured output schema for the metadata LLM call, so replies always parse
+METADATA_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "video_meta",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "required": ["title", "description", "topics", "keywords"],
+            "properties": {
+                "title": {"type": "string"},
+                "description": {"type": "string"},
+                "topics": {"type": "array", "items": {"type": "string"}},
+                "keywords": {"type": "array", "items": {"type": "string"}},
+            },
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Word separators in video filenames
+_SEP_RE = re.compile(r"[_\-.\s]+")
 
 
 def get_minio_client() -> Minio:
-    """Create and return MinIO client."""
+    """Create and return MinIO client.
+
+    Same HTTP settings as the MinIO default, but with a connection pool large
+    enough to keep a connection alive for every worker thread.
+    """
+    timeout = timedelta(minutes=5).seconds
+    http_client = urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=timeout, read=timeout),
+        maxsize=max(10, MAX_WORKERS * 2),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(
+            total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+        ),
+    )
     return Minio(
         MINIO_ENDPOINT,
         access_key=MINIO_ACCESS_KEY,
         secret_key=MINIO_SECRET_KEY,
         secure=MINIO_SECURE,
+        http_client=http_client,
     )
 
 
@@ -72,37 +153,37 @@ def list_videos(client: Minio, bucket: str, prefix: str = "", max_videos: int =
     Returns:
         List of video info dicts sorted by size (smallest first)
     """
-    videos = []
     if prefix and not prefix.endswith("/"):
         prefix = prefix + "/"
 
-    try:
-        objects = client.list_objects(bucket, prefix=prefix, recursive=True)
-        for obj in objects:
-            if obj.object_name.lower().endswith(".mp4"):
-                videos.append(
-                    {
+    def iter_videos():
+        try:
+            objects = client.list_objects(bucket, prefix=prefix, recursive=True)
+            for obj in objects:
+                if obj.object_name.lower().endswith(".mp4"):
+                    yield {
                         "object_name": obj.object_name,
                         "size": obj.size,
+                        "etag": obj.etag,
                         "last_modified": obj.last_modified.isoformat()
                         if obj.last_modified
                         else None,
                     }
-                )
-    except Exception as e:
-        print(f"Error listing objects: {e}")
-
-    # Sort by size (smallest first)
-    videos.sort(key=lambda v: v["size"])
+        except Exception as e:
+            print(f"Error listing objects: {e}")
 
-    # Apply limit if specified
+    # With a limit, keep only the smallest max_videos while streaming the listing
     if max_videos > 0:
-        videos = videos[:max_videos]
+        return heapq.nsmallest(max_videos, iter_videos(), key=lambda v: v["size"])
+    return sorted(iter_videos(), key=lambda v: v["size"])
+
 
-    return videos
+def _log(label: str, message: str):
+    """Write a worker-thread message, tagged with the video (label) it concerns."""
+    tqdm.write(f"  [{label}] {message}" if label else f"  {message}")
 
 
-def download_video(client: Minio, bucket: str, object_name: str) -> str:
+def download_video(client: Minio, bucket: str, object_name: str, label: str = "") -> str:
     """Download video to temporary file and return path."""
     suffix = Path(object_name).suffix
     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
@@ -111,38 +192,140 @@ def download_video(client: Minio, bucket: str, object_name: str) -> str:
 
     try:
         client.fget_object(bucket, object_name, temp_path)
-        print(f"  Downloaded: {object_name} -> {temp_path}")
+        _log(label, f"Downloaded: {object_name} -> {temp_path}")
         return temp_path
     except Exception as e:
-        print(f"  Error downloading {object_name}: {e}")
+        _log(label, f"Error downloading {object_name}: {e}")
         if os.path.exists(temp_path):
             os.remove(temp_path)
         return ""
 
 
-def transcribe_video(openai_client: OpenAI, video_path: str) -> dict | None:
-    """Transcribe video using OpenAI Whisper API."""
+def fetch_video_bytes(
+    client: Minio, bucket: str, object_name: str, label: str = ""
+) -> bytes | None:
+    """Read a video object from MinIO straight into memory."""
+    response = None
     try:
-        with open(video_path, "rb") as audio_file:
-            print("  Transcribing with Whisper API...")
-            transcript = openai_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="id",
-                response_format="verbose_json",
-                timestamp_granularities=["segment"],
+        response = client.get_object(bucket, object_name)
+        data = response.read()
+        _log(label, f"Fetched: {object_name} ({len(data) / 1024 / 1024:.1f} MB)")
+        return data
+    except Exception as e:
+        _log(label, f"Error fetching {object_name}: {e}")
+        return None
+    finally:
+        if response is not None:
+            response.close()
+            response.release_conn()
+
+
+def extract_audio(video_source: str, label: str = "") -> str:
+    """Extract mono 16 kHz Opus audio with ffmpeg and return the temp .ogg path.
+
+    video_source can be a local path or a URL ffmpeg can read, such as a
+    presigned MinIO URL. Returns "" on failure.
+    """
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ogg")
+    audio_path = temp_file.name
+    temp_file.close()
+
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-i", video_source,
+                "-vn", "-acodec", "libopus", "-ar", "16000", "-ac", "1", "-b:a", "24k",
+                audio_path,
+            ],
+            check=True,
+            capture_output=True,
+        )
+        _log(label, f"Extracted audio: {os.path.getsize(audio_path) / 1024 / 1024:.1f} MB")
+        return audio_path
+    except (OSError, subprocess.CalledProcessError) as e:
+        # Don't print the command: it contains the presigned URL
+        _log(label, f"Error extracting audio: {getattr(e, 'returncode', e)}")
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+        return ""
+
+
+_local_whisper_model = None
+_local_whisper_lock = threading.Lock()
+
+
+def get_local_whisper_model():
+    """Load the faster-whisper model once and share it between threads."""
+    global _local_whisper_model
+    with _local_whisper_lock:
+        if _local_whisper_model is None:
+            # Imported lazily: only LOCAL_WHISPER runs need faster-whisper
+            from faster_whisper import WhisperModel
+
+            tqdm.write(f"Loading local Whisper model '{LOCAL_WHISPER_MODEL}'...")
+            _local_whisper_model = WhisperModel(
+                LOCAL_WHISPER_MODEL, device="auto", compute_type="auto"
             )
+    return _local_whisper_model
 
-        segments = []
-        if hasattr(transcript, "segments") and transcript.segments:
-            for seg in transcript.segments:
-                segments.append(
-                    {
-                        "text": getattr(seg, "text", "").strip(),
-                        "start": getattr(seg, "start", 0.0),
-                        "end": getattr(seg, "end", 0.0),
-                    }
-                )
+
+def transcribe_local(video_file, label: str = "") -> dict | None:
+    """Transcribe video or audio on this machine with faster-whisper.
+
+    Args:
+        video_file: Open binary file or (filename, bytes, content_type) tuple
+        label: Video id prefixed to log messages
+    """
+    if isinstance(video_file, tuple):
+        video_file = io.BytesIO(video_file[1])
+
+    try:
+        _log(label, "Transcribing with local Whisper model...")
+        segments_iter, info = get_local_whisper_model().transcribe(
+            video_file, language="id", vad_filter=True
+        )
+        segments = [
+            {"text": seg.text.strip(), "start": seg.start, "end": seg.end}
+            for seg in segments_iter
+        ]
+    except Exception as e:
+        _log(label, f"Error transcribing: {e}")
+        return None
+
+    return {
+        "segments": segments,
+        "full_text": " ".join(seg["text"] for seg in segments),
+        "duration": info.duration,
+        "language": "id",
+    }
+
+
+def transcribe_video(openai_client: OpenAI, video_file, label: str = "") -> dict | None:
+    """Transcribe video using OpenAI Whisper API (or locally with LOCAL_WHISPER).
+
+    Args:
+        openai_client: OpenAI client
+        video_file: Open binary file or (filename, bytes, content_type) tuple
+        label: Video id prefixed to log messages
+    """
+    if LOCAL_WHISPER:
+        return transcribe_local(video_file, label)
+
+    try:
+        _log(label, "Transcribing with Whisper API...")
+        transcript = openai_client.audio.transcriptions.create(
+            model="whisper-1",
+            file=video_file,
+            language="id",
+            response_format="verbose_json",
+            timestamp_granularities=["segment"],
+        )
+
+        # verbose_json segments always carry text/start/end
+        segments = [
+            {"text": seg.text.strip(), "start": seg.start, "end": seg.end}
+            for seg in getattr(transcript, "segments", None) or []
+        ]
 
         full_text = transcript.text if hasattr(transcript, "text") else ""
         duration = segments[-1]["end"] if segments else 0.0
@@ -154,9 +337,113 @@ def transcribe_video(openai_client: OpenAI, video_path: str) -> dict | None:
             "language": "id",
         }
     except Exception as e:
-        print(f"  Error transcribing: {e}")
+        _log(label, f"Error transcribing: {e}")
+        return None
+
+
+def probe_duration(media_path: str) -> float:
+    """Return the media duration in seconds using ffprobe (0.0 if unknown)."""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1", media_path,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return float(result.stdout.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return 0.0
+
+
+def cut_audio_chunk(audio_path: str, start: float, chunk_path: str):
+    """Copy CHUNK_SECONDS (+ overlap) of audio from start into chunk_path, without re-encoding."""
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-ss", str(start), "-t", str(CHUNK_SECONDS + CHUNK_OVERLAP_SECONDS),
+            "-i", audio_path, "-c", "copy", chunk_path,
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+def _word_jaccard(a: str, b: str) -> float:
+    """Jaccard similarity of the lowercased word sets of two strings."""
+    words_a, words_b = set(a.lower().split()), set(b.lower().split())
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def stitch_chunk_segments(chunk_results: list[tuple[float, list[dict]]]) -> list[dict]:
+    """Offset chunk segments to absolute time and drop overlap duplicates."""
+    segments = []
+    for chunk_start, chunk_segments in chunk_results:
+        for seg in chunk_segments:
+            seg = {**seg, "start": seg["start"] + chunk_start, "end": seg["end"] + chunk_start}
+            if chunk_start > 0:
+                # Fully inside the overlap: the previous chunk already covered it
+                if seg["end"] <= chunk_start + CHUNK_OVERLAP_SECONDS:
+                    continue
+                # Same speech transcribed at both chunk edges
+                if any(
+                    abs(prev["start"] - seg["start"]) < 0.5
+                    and _word_jaccard(prev["text"], seg["text"]) > 0.8
+                    for prev in segments[-5:]
+                ):
+                    continue
+            segments.append(seg)
+    return segments
+
+
+def transcribe_audio(openai_client: OpenAI, audio_path: str, label: str = "") -> dict | None:
+    """Transcribe an extracted audio file, in parallel chunks when it is long."""
+    # The local model has no upload limit, so chunking only helps the API
+    duration = probe_duration(audio_path)
+    if LOCAL_WHISPER or duration < LONG_AUDIO_SECONDS:
+        with open(audio_path, "rb") as audio_file:
+            return transcribe_video(openai_client, audio_file, label)
+
+    # Each chunk also covers the next CHUNK_OVERLAP_SECONDS, so a start whose audio
+    # lies entirely in that overlap would only add a redundant (or sub-0.1 s) call
+    base_path = os.path.splitext(audio_path)[0]
+    starts = range(0, math.ceil(duration - CHUNK_OVERLAP_SECONDS), CHUNK_SECONDS)
+    chunks = [(float(start), f"{base_path}_chunk{i}.ogg") for i, start in enumerate(starts)]
+    _log(label, f"Splitting {format_duration(duration)} of audio into {len(chunks)} chunks")
+
+    def transcribe_chunk(chunk: tuple[float, str]) -> dict | None:
+        start, chunk_path = chunk
+        cut_audio_chunk(audio_path, start, chunk_path)
+        with open(chunk_path, "rb") as chunk_file:
+            return transcribe_video(openai_client, chunk_file, label)
+
+    try:
+        with ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as executor:
+            results = list(executor.map(transcribe_chunk, chunks))
+    except subprocess.CalledProcessError as e:
+        _log(label, f"Error splitting audio: ffmpeg exit {e.returncode}")
+        return None
+    finally:
+        for _, chunk_path in chunks:
+            if os.path.exists(chunk_path):
+                os.remove(chunk_path)
+
+    if any(result is None for result in results):
         return None
 
+    segments = stitch_chunk_segments(
+        [(start, result["segments"]) for (start, _), result in zip(chunks, results)]
+    )
+    return {
+        "segments": segments,
+        "full_text": " ".join(seg["text"] for seg in segments),
+        "duration": segments[-1]["end"] if segments else 0.0,
+        "language": "id",
+    }
+
 
 def format_vtt_timestamp(seconds: float) -> str:
     """Convert seconds to VTT timestamp format (HH:MM:SS.mmm)."""
@@ -168,19 +455,13 @@ def format_vtt_timestamp(seconds: float) -> str:
 
 def generate_vtt(segments: list[dict]) -> str:
     """Generate WebVTT subtitle content from segments."""
-    vtt_lines = ["WEBVTT", ""]
-
-    for i, seg in enumerate(segments, 1):
-        start = format_vtt_timestamp(seg["start"])
-        end = format_vtt_timestamp(seg["end"])
-        text = seg["text"]
-
-        vtt_lines.append(f"{i}")
-        vtt_lines.append(f"{start} --> {end}")
-        vtt_lines.append(text)
-        vtt_lines.append("")
-
-    return "\n".join(vtt_lines)
+    # One formatted cue per segment, joined once
+    return "WEBVTT\n" + "".join(
+        f"\n{i}\n"
+        f"{format_vtt_timestamp(seg['start'])} --> {format_vtt_timestamp(seg['end'])}\n"
+        f"{seg['text']}\n"
+        for i, seg in enumerate(segments, 1)
+    )
 
 
 def save_vtt_file(video_id: str, vtt_content: str) -> str:
@@ -196,29 +477,32 @@ def save_vtt_file(video_id: str, vtt_content: str) -> str:
     return f"subtitles/{vtt_filename}"
 
 
-def extract_title_from_filename(filename: str) -> str:
-    """Extract readable title from filename."""
-    name = Path(filename).stem
-    name = name.replace("_", " ").replace("-", " ")
-    return name.title()
+@lru_cache(maxsize=1024)
+def _parse_stem(filename: str) -> tuple[str, tuple[str, ...]]:
+    """Parse a video filename into a readable title and fallback keywords.
 
+    Keywords are returned as a tuple so the cached value can't be mutated.
+    """
+    stem = Path(filename).stem
+    title = stem.replace("_", " ").replace("-", " ").title()
+    # Split on separators and filter short words
+    keywords = tuple(w for w in _SEP_RE.split(stem.lower()) if len(w) > 2)
+    return title, keywords
 
-def extract_metadata_with_llm(
-    openai_client: OpenAI, filename: str, transcript_text: str
-) -> dict:
-    """Use LLM to extract title, description, and rich topics from video content."""
+
+def build_metadata_request(filename: str, transcript_text: str) -> dict:
+    """Build the chat completion request body for extracting video metadata."""
     max_transcript_len = 4000
     truncated_transcript = transcript_text[:max_transcript_len]
     if len(transcript_text) > max_transcript_len:
         truncated_transcript += "..."
 
-    try:
-        response = openai_client.chat.completions.create(
-            model="gpt-5-nano-2025-08-07",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """Kamu adalah asisten yang menganalisis konten video pembelajaran FISIKA.
+    return {
+        "model": "gpt-5-nano-2025-08-07",
+        "messages": [
+            {
+                "role": "system",
+                "content": """Kamu adalah asisten yang menganalisis konten video pembelajaran FISIKA.
 Berdasarkan nama file dan transkrip video, ekstrak informasi berikut dalam format JSON:
 
 {
@@ -248,60 +532,144 @@ ATURAN PENTING untuk topics dan keywords (HARUS 30-50 item total):
 5. Sertakan istilah yang mungkin dicari siswa SD/SMP
 
 Balas HANYA dengan JSON, tanpa penjelasan tambahan.""",
-                },
-                {
-                    "role": "user",
-                    "content": f"Filename: {filename}\n\nTranskrip:\n{truncated_transcript}",
-                },
-            ],
-        )
+            },
+            {
+                "role": "user",
+                "content": f"Filename: {filename}\n\nTranskrip:\n{truncated_transcript}",
+            },
+        ],
+        "response_format": METADATA_RESPONSE_FORMAT,
+    }
 
-        result_text = response.choices[0].message.content.strip()
 
-        if result_text.startswith("```"):
-            result_text = result_text.split("```")[1]
-            if result_text.startswith("json"):
-                result_text = result_text[4:]
-            result_text = result_text.strip()
+def parse_metadata(filename: str, result_text: str) -> dict:
+    """Parse the LLM metadata reply, filling gaps from the filename.
 
-        metadata = json.loads(result_text)
+    Raises ValueError if the reply is not valid JSON.
+    """
+    metadata = json.loads(result_text)
+    filename_title, filename_keywords = _parse_stem(filename)
+
+    # Combine topics and keywords, ensure minimum coverage
+    topics = metadata.get("topics", [])
+    keywords = metadata.get("keywords", [])
+
+    return {
+        "title": metadata.get("title", filename_title),
+        "description": metadata.get(
+            "description", f"Video pembelajaran: {filename}"
+        ),
+        # Add filename-based keywords as fallback
+        "topics": topics if topics else list(filename_keywords),
+        "keywords": keywords if keywords else [],
+        "metadata_source": "llm",
+    }
 
-        # Combine topics and keywords, ensure minimum coverage
-        topics = metadata.get("topics", [])
-        keywords = metadata.get("keywords", [])
 
-        # Add filename-based keywords as fallback
-        filename_keywords = extract_keywords_from_filename(filename)
+def fallback_metadata(filename: str) -> dict:
+    """Metadata derived from the filename alone, used when the LLM fails."""
+    title, filename_keywords = _parse_stem(filename)
+    return {
+        "title": title,
+        "description": f"Video pembelajaran: {title}",
+        "topics": list(filename_keywords),
+        "keywords": [],
+        # Marks the entry for another LLM attempt on the next run
+        "metadata_source": "filename",
+    }
 
-        return {
-            "title": metadata.get("title", extract_title_from_filename(filename)),
-            "description": metadata.get(
-                "description", f"Video pembelajaran: {filename}"
-            ),
-            "topics": topics if topics else filename_keywords,
-            "keywords": keywords if keywords else [],
-        }
 
+def extract_metadata_with_llm(
+    openai_client: OpenAI, filename: str, transcript_text: str, label: str = ""
+) -> dict:
+    """Use LLM to extract title, description, and rich topics from video content."""
+    try:
+        response = openai_client.chat.completions.create(
+            **build_metadata_request(filename, transcript_text)
+        )
+        return parse_metadata(filename, response.choices[0].message.content)
     except Exception as e:
-        print(f"  Warning: LLM extraction failed ({e}), using fallback")
-        title = extract_title_from_filename(filename)
-        filename_keywords = extract_keywords_from_filename(filename)
-        return {
-            "title": title,
-            "description": f"Video pembelajaran: {title}",
-            "topics": filename_keywords,
-            "keywords": [],
-        }
+        _log(label, f"Warning: LLM extraction failed ({e}), using fallback")
+        return fallback_metadata(filename)
+
 
+def extract_metadata_batch(openai_client: OpenAI, videos: list[dict]) -> dict[str, dict]:
+    """Extract metadata for many videos with a single OpenAI Batch API job.
 
-def extract_keywords_from_filename(filename: str) -> list[str]:
-    """Extract keywords from filename as fallback."""
-    name = Path(filename).stem.lower()
-    # Replace separators with spaces
-    name = name.replace("_", " ").replace("-", " ").replace(".", " ")
-    # Split and filter short words
-    words = [w.strip() for w in name.split() if len(w.strip()) > 2]
-    return words
+    Args:
+        openai_client: OpenAI client
+        videos: Video data dicts with "id", "filename" and "transcript_text"
+
+    Returns:
+        Metadata dicts keyed by video id. Videos whose request failed, or
+        the whole set if the batch itself failed, are missing.
+    """
+    lines = [
+        json.dumps(
+            {
+                "custom_id": v["id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": build_metadata_request(v["filename"], v["transcript_text"]),
+            },
+            ensure_ascii=False,
+        )
+        for v in videos
+    ]
+    filenames = {v["id"]: v["filename"] for v in videos}
+
+    try:
+        batch_file = openai_client.files.create(
+            file=("metadata_requests.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        tqdm.write(f"  Submitted batch {batch.id} ({len(lines)} requests)")
+
+        deadline = time.monotonic() + BATCH_MAX_WAIT_SECONDS
+        try:
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                if time.monotonic() >= deadline:
+                    tqdm.write(f"  Warning: batch {batch.id} unfinished after {BATCH_MAX_WAIT_SECONDS}s, cancelling")
+                    openai_client.batches.cancel(batch.id)
+                    return {}
+                time.sleep(BATCH_POLL_SECONDS)
+                batch = openai_client.batches.retrieve(batch.id)
+                counts = batch.request_counts
+                if counts:
+                    tqdm.write(f"  Batch {batch.status}: {counts.completed}/{counts.total} done")
+        except KeyboardInterrupt:
+            # Don't leave a job running whose results nobody will collect
+            tqdm.write(f"\n  Interrupted, cancelling batch {batch.id}")
+            openai_client.batches.cancel(batch.id)
+            raise
+
+        if not batch.output_file_id:
+            tqdm.write(f"  Warning: batch {batch.id} ended with status {batch.status}")
+            return {}
+        output = openai_client.files.content(batch.output_file_id).text
+    except Exception as e:
+        tqdm.write(f"  Warning: batch metadata extraction failed ({e})")
+        return {}
+
+    results = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            video_id = item["custom_id"]
+            body = item["response"]["body"]
+            results[video_id] = parse_metadata(
+                filenames[video_id], body["choices"][0]["message"]["content"]
+            )
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            tqdm.write(f"  Warning: unusable batch result ({e})")
+    return results
 
 
 def format_duration(seconds: float) -> str:
@@ -315,13 +683,74 @@ def format_duration(seconds: float) -> str:
     return f"{minutes}:{secs:02d}"
 
 
-def format_eta(seconds: float) -> str:
-    """Format seconds into HH:MM:SS."""
-    seconds = max(0, int(seconds))
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    secs = seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+def transcribe_object(
+    minio_client: Minio, openai_client: OpenAI, bucket: str, video_info: dict, label: str = ""
+) -> dict | None:
+    """Transcribe a MinIO video.
+
+    With ffmpeg, only the extracted audio track is uploaded. Otherwise the
+    video itself is uploaded, from memory when small enough, else via a
+    temp file.
+    """
+    object_name = video_info["object_name"]
+
+    if FFMPEG_AVAILABLE:
+        # ffmpeg reads the object over HTTP, so the video is never stored locally
+        video_url = minio_client.presigned_get_object(
+            bucket, object_name, expires=timedelta(hours=1)
+        )
+        audio_path = extract_audio(video_url, label)
+        if audio_path:
+            try:
+                return transcribe_audio(openai_client, audio_path, label)
+            finally:
+                os.remove(audio_path)
+        _log(label, "Falling back to uploading the full video")
+
+    if video_info["size"] <= MAX_IN_MEMORY_BYTES:
+        video_bytes = fetch_video_bytes(minio_client, bucket, object_name, label)
+        if video_bytes is None:
+            return None
+        return transcribe_video(
+            openai_client, (Path(object_name).name, video_bytes, "video/mp4"), label
+        )
+
+    local_path = download_video(minio_client, bucket, object_name, label)
+    if not local_path:
+        return None
+    try:
+        with open(local_path, "rb") as video_file:
+            return transcribe_video(openai_client, video_file, label)
+    finally:
+        os.remove(local_path)
+        _log(label, "Cleaned up temp file")
+
+
+def update_metadata(openai_client: OpenAI, videos: list[dict], use_batch: bool):
+    """Replace the filename-only metadata of videos with LLM metadata, in place."""
+    batch_metadata = {}
+    if use_batch:
+        tqdm.write(f"\nExtracting metadata for {len(videos)} video(s) via the Batch API...")
+        batch_metadata = extract_metadata_batch(openai_client, videos)
+        tqdm.write(f"  Got {len(batch_metadata)}/{len(videos)} result(s) from the batch")
+
+    # No batch, or missing from its output: direct requests
+    missing = [v for v in videos if v["id"] not in batch_metadata]
+    if missing:
+        tqdm.write(f"\nExtracting metadata for {len(missing)} video(s)...")
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = executor.map(
+                lambda v: extract_metadata_with_llm(
+                    openai_client, v["filename"], v.get("transcript_text", ""), v["id"]
+                ),
+                missing,
+            )
+            for video_data, metadata in zip(missing, results):
+                video_data.update(metadata)
+
+    for video_data in videos:
+        if video_data["id"] in batch_metadata:
+            video_data.update(batch_metadata[video_data["id"]])
 
 
 def process_video(
@@ -330,68 +759,82 @@ def process_video(
     bucket: str,
     video_info: dict,
     video_index: int,
+    extract_metadata: bool = True,
 ) -> dict | None:
     """Process a single video: download, transcribe, generate VTT and rich topics.
 
+    With extract_metadata=False the LLM call is skipped and filename-based
+    metadata is used, so the caller can fill it in later (e.g. via a batch).
+
     Returns:
         Video metadata dict or None on failure
     """
     object_name = video_info["object_name"]
     video_id = f"video_{video_index:03d}"
 
-    print(f"\nProcessing [{video_id}]: {object_name}")
+    tqdm.write(f"\nProcessing [{video_id}]: {object_name}")
 
-    # Download video
-    local_path = download_video(minio_client, bucket, object_name)
-    if not local_path:
+    # Transcribe
+    transcript_data = transcribe_object(minio_client, openai_client, bucket, video_info, video_id)
+    if not transcript_data:
+        _log(video_id, f"Failed: {object_name}")
         return None
 
-    try:
-        # Transcribe
-        transcript_data = transcribe_video(openai_client, local_path)
-        if not transcript_data:
-            return None
-
-        # Generate VTT
-        vtt_content = generate_vtt(transcript_data["segments"])
-        subtitle_file = save_vtt_file(video_id, vtt_content)
-        print(f"  Saved subtitle: {subtitle_file}")
+    # Generate VTT
+    vtt_content = generate_vtt(transcript_data["segments"])
+    subtitle_file = save_vtt_file(video_id, vtt_content)
+    _log(video_id, f"Saved subtitle: {subtitle_file}")
 
-        # Extract metadata with rich topics using LLM
-        print("  Extracting metadata with rich topics...")
+    # Extract metadata with rich topics using LLM
+    if extract_metadata:
+        _log(video_id, "Extracting metadata with rich topics...")
         metadata = extract_metadata_with_llm(
-            openai_client, object_name, transcript_data["full_text"]
+            openai_client, object_name, transcript_data["full_text"], video_id
         )
-        print(
-            f"  Generated {len(metadata['topics'])} topics, {len(metadata.get('keywords', []))} keywords"
+        _log(
+            video_id,
+            f"Generated {len(metadata['topics'])} topics, {len(metadata.get('keywords', []))} keywords",
         )
+    else:
+        metadata = fallback_metadata(object_name)
+
+    # Build video metadata
+    video_data = {
+        "id": video_id,
+        "title": metadata["title"],
+        "description": metadata["description"],
+        "filename": object_name,
+        "url": get_video_url(object_name),
+        "duration": transcript_data["duration"],
+        "duration_formatted": format_duration(transcript_data["duration"]),
+        "topics": metadata["topics"],
+        "keywords": metadata.get("keywords", []),
+        "transcript": transcript_data["segments"],
+        "transcript_text": transcript_data["full_text"],
+        "subtitle_file": subtitle_file,
+        "language": "id",
+        "created_at": video_info.get("last_modified"),
+        "transcribed_at": datetime.now().isoformat(),
+        "etag": video_info.get("etag"),
+        "metadata_source": metadata["metadata_source"],
+    }
 
-        # Build video metadata
-        video_data = {
-            "id": video_id,
-            "title": metadata["title"],
-            "description": metadata["description"],
-            "filename": object_name,
-            "url": get_video_url(object_name),
-            "duration": transcript_data["duration"],
-            "duration_formatted": format_duration(transcript_data["duration"]),
-            "topics": metadata["topics"],
-            "keywords": metadata.get("keywords", []),
-            "transcript": transcript_data["segments"],
-            "transcript_text": transcript_data["full_text"],
-            "subtitle_file": subtitle_file,
-            "language": "id",
-            "created_at": video_info.get("last_modified"),
-            "transcribed_at": datetime.now().isoformat(),
-        }
+    _log(video_id, f"Completed: {metadata['title']} ({video_data['duration_formatted']})")
+    return video_data
 
-        print(f"  Completed: {metadata['title']} ({video_data['duration_formatted']})")
-        return video_data
 
-    finally:
-        if os.path.exists(local_path):
-            os.remove(local_path)
-            print("  Cleaned up temp file")
+def load_existing_videos() -> dict[str, dict]:
+    """Load previously generated videos from VIDEOS_FILE, keyed by filename."""
+    if not VIDEOS_FILE.exists():
+        return {}
+    try:
+        raw = VIDEOS_FILE.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        videos = data.get("videos", [])
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read existing {VIDEOS_FILE} ({e})")
+        return {}
+    return {v["filename"]: v for v in videos if v.get("filename")}
 
 
 def save_videos_json(videos: list[dict]):
@@ -409,11 +852,23 @@ def save_videos_json(videos: list[dict]):
         },
     }
 
-    with open(VIDEOS_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        VIDEOS_FILE.write_bytes(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    else:
+        with open(VIDEOS_FILE, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
 
     print(f"\nSaved video metadata to: {VIDEOS_FILE}")
 
+    # Binary copy for faster app start-up. It starts with the exact stamp of the
+    # videos.json it mirrors; app.py only uses it while that stamp still matches.
+    if msgpack is not None:
+        stat = VIDEOS_FILE.stat()
+        with open(VIDEOS_MSGPACK_FILE, "wb") as f:
+            msgpack.pack({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}, f)
+            msgpack.pack(output, f)
+        print(f"Saved binary copy to: {VIDEOS_MSGPACK_FILE}")
+
 
 def main():
     """Main function to process all videos from MinIO."""
@@ -430,10 +885,15 @@ def main():
         print("Error: OPENAI_API_KEY must be set")
         return
 
+    if LOCAL_WHISPER and importlib.util.find_spec("faster_whisper") is None:
+        print("Error: LOCAL_WHISPER=true requires the faster-whisper package")
+        return
+
     print(f"\nMinIO Endpoint: {MINIO_ENDPOINT}")
     print(f"Bucket: {MINIO_BUCKET}")
     print(f"Videos Path: {MINIO_VIDEOS_PATH or '(root)'}")
     print(f"Secure: {MINIO_SECURE}")
+    print(f"Transcription: {'local ' + LOCAL_WHISPER_MODEL if LOCAL_WHISPER else 'Whisper API'}")
 
     # Create clients
     print("\nConnecting to MinIO...")
@@ -471,34 +931,67 @@ def main():
     for v in video_list:
         print(f"  - {v['object_name']} ({v['size'] / 1024 / 1024:.1f} MB)")
 
-    # Process each video
+    # Reuse videos whose MinIO object is unchanged since the last run
+    existing = load_existing_videos()
     processed_videos = []
-    total_count = len(video_list)
-    processed_count = 0
-    start_time = time.monotonic()
-
-    for i, video_info in enumerate(video_list, 1):
-        video_start = time.monotonic()
-        video_data = process_video(
-            minio_client, openai_client, MINIO_BUCKET, video_info, i
-        )
-        video_elapsed = time.monotonic() - video_start
-
-        if video_data:
-            processed_videos.append(video_data)
-            processed_count += 1
-
-        elapsed_total = time.monotonic() - start_time
-        avg_per_video = (elapsed_total / processed_count) if processed_count else 0.0
-        remaining_videos = total_count - processed_count
-        eta_remaining = avg_per_video * remaining_videos if processed_count else 0.0
-
-        print(
-            f"  ⏱ Time this video: {format_eta(video_elapsed)} | "
-            f"Elapsed: {format_eta(elapsed_total)} | "
-            f"ETA: {format_eta(eta_remaining)} "
-            f"({processed_count}/{total_count})"
-        )
+    pending = []
+    for video_info in video_list:
+        cached = existing.get(video_info["object_name"])
+        if cached and video_info["etag"] and cached.get("etag") == video_info["etag"]:
+            processed_videos.append(cached)
+        else:
+            pending.append(video_info)
+    if processed_videos:
+        print(f"\nReusing {len(processed_videos)} unchanged video(s) from {VIDEOS_FILE}")
+
+    # Reused videos whose LLM metadata failed last time get another attempt
+    stale_metadata = [v for v in processed_videos if v.get("metadata_source") == "filename"]
+    if stale_metadata:
+        print(f"{len(stale_metadata)} of them only have filename metadata")
+
+    # New/changed videos get indices whose ids are not held by a reused video
+    used_ids = {v["id"] for v in processed_videos}
+    free_indices = (i for i in itertools.count(1) if f"video_{i:03d}" not in used_ids)
+    jobs = [(next(free_indices), video_info) for video_info in pending]
+
+    # Several videos: metadata is extracted afterwards in one batch job
+    use_batch = METADATA_BATCH and len(jobs) + len(stale_metadata) > 1
+
+    # Process videos concurrently; each one is dominated by network I/O
+    new_videos = []
+
+    print(f"\nProcessing {len(jobs)} video(s) with {MAX_WORKERS} worker(s)...")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(
+                process_video,
+                minio_client,
+                openai_client,
+                MINIO_BUCKET,
+                video_info,
+                i,
+                not use_batch,
+            )
+            for i, video_info in jobs
+        ]
+        # tqdm reports elapsed time, rate and ETA as videos finish
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Transcribing"):
+            video_data = future.result()
+            if video_data:
+                new_videos.append(video_data)
+
+    processed_videos.extend(new_videos)
+
+    # Completion order is arbitrary; keep the output ordered by video id
+    processed_videos.sort(key=lambda v: v["id"])
+
+    metadata_jobs = stale_metadata + (new_videos if use_batch else [])
+    if metadata_jobs:
+        if use_batch:
+            # Batches can take hours: keep the transcripts if the run dies meanwhile.
+            # Entries marked "filename" get their metadata retried on the next run.
+            save_videos_json(processed_videos)
+        update_metadata(openai_client, metadata_jobs, use_batch)
 
     # Save results
     if processed_videos:
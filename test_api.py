@@ -4,11 +4,23 @@
 import os
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
 VIDEO_DATA_API_URL = os.getenv("VIDEO_DATA_API_URL", "")
 
+# Keep-alive session with the same retry policy as app.py's shared session
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+)
+_SESSION = requests.Session()
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 if not VIDEO_DATA_API_URL:
     print("❌ VIDEO_DATA_API_URL not set in .env")
     exit(1)
@@ -16,7 +28,7 @@ if not VIDEO_DATA_API_URL:
 print(f"🔍 Testing API endpoint: {VIDEO_DATA_API_URL}")
 
 try:
-    response = requests.get(VIDEO_DATA_API_URL, timeout=10)
+    response = _SESSION.get(VIDEO_DATA_API_URL, timeout=10)
     response.raise_for_status()
     data = response.json()
     